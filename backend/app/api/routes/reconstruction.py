@@ -1,19 +1,137 @@
 """Reconstruction API route handlers."""
 
+import asyncio
+import hashlib
 import logging
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import ORJSONResponse
 
-from app.core.reconstruction import Reconstruction3D
-from app.core.utils import bytes_to_bgr, estimate_intrinsics, parse_middlebury_calib
+from app.core.reconstruction import Detector, run_reconstruction
+from app.core.utils import (
+    DECODE_REDUCTIONS,
+    bytes_to_bgr,
+    estimate_intrinsics,
+    parse_middlebury_calib,
+    scale_intrinsics,
+)
 from app.models.schemas import ReconstructionResponse
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/reconstruct", tags=["reconstruction"])
 
+# ---------------------------------------------------------------------------
+# Worker pool — reconstruction is CPU-bound and only releases the GIL inside
+# individual OpenCV calls, so it runs in separate processes.
+# ---------------------------------------------------------------------------
 
-@router.post("", response_model=ReconstructionResponse)
+
+def _default_max_workers() -> int:
+    # os.cpu_count() reports the host's cores even inside a container.  The
+    # affinity mask at least honours cpusets, and each worker already runs
+    # OpenCV's own thread pool plus a 2-thread feature executor, so only
+    # half the available cores get a worker.
+    if hasattr(os, "sched_getaffinity"):
+        available = len(os.sched_getaffinity(0))
+    else:
+        available = os.cpu_count() or 1
+    return max(1, available // 2)
+
+
+MAX_WORKERS = int(os.getenv("RECON_MAX_WORKERS", "0")) or _default_max_workers()
+
+
+# Decode uploads at 1/N resolution (1, 2, 4 or 8).  Useful for very large
+# JPEGs, which libjpeg can decode directly at reduced size.
+def _read_decode_reduction() -> int:
+    # Validated at import so a bad value stops startup instead of failing every
+    # upload with a client-side 422
+    raw = os.getenv("RECON_DECODE_REDUCTION", "1")
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 0  # not a supported factor; reported below
+    if value not in DECODE_REDUCTIONS:
+        raise ValueError(f"RECON_DECODE_REDUCTION must be one of {DECODE_REDUCTIONS}, got {raw!r}.")
+    return value
+
+
+DECODE_REDUCTION = _read_decode_reduction()
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the shared reconstruction process pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the parent holds threads and locks (event loop,
+        # executor threads, OpenCV) that must not be copied mid-use.
+        _pool = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """Shut down the reconstruction process pool, if one was started."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _discard_broken_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop ``pool`` after a worker crash so the next request starts a fresh one.
+
+    Every request waiting on a broken pool gets BrokenProcessPool, possibly
+    after another request has already replaced it; only the pool that actually
+    failed is shut down, never a healthy replacement.  Does not wait, since it
+    runs on the event loop.
+    """
+    global _pool
+    if _pool is pool:
+        _pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Result cache — repeated uploads of the same stereo pair (demos, CI) skip the
+# pipeline.  Keyed on SHA-256 digests of the uploaded bytes.
+# ---------------------------------------------------------------------------
+CACHE_SIZE = int(os.getenv("RECON_CACHE_SIZE", "32"))
+
+_cache: OrderedDict[tuple[str, ...], dict] = OrderedDict()
+
+
+def _cache_key(*uploads: bytes | None) -> tuple[str, ...]:
+    # An omitted upload keys as "" so it never collides with an empty file
+    return tuple("" if data is None else hashlib.sha256(data).hexdigest() for data in uploads)
+
+
+def _cache_get(key: tuple[str, ...]) -> dict | None:
+    result = _cache.get(key)
+    if result is not None:
+        _cache.move_to_end(key)
+    return result
+
+
+def _cache_put(key: tuple[str, ...], result: dict) -> None:
+    if CACHE_SIZE <= 0:
+        return
+    _cache[key] = result
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+@router.post("", response_model=ReconstructionResponse, response_class=ORJSONResponse)
 async def reconstruct(
     im0: UploadFile = File(..., description="Left stereo image (PNG/JPEG)."),
     im1: UploadFile = File(..., description="Right stereo image (PNG/JPEG)."),
@@ -24,27 +142,47 @@ async def reconstruct(
             "If omitted, intrinsics are estimated from image dimensions."
         ),
     ),
-) -> ReconstructionResponse:
+    detector: Detector = Form(
+        "SIFT",
+        description=(
+            "Feature detector.  ORB with Hamming matching is faster but less "
+            "accurate than the default SIFT."
+        ),
+    ),
+) -> ORJSONResponse:
     """Run the full stereo 3D reconstruction pipeline.
 
     Upload a stereo image pair (and optionally a calibration file) to receive:
     - A list of triangulated 3D points with per-point RGB colours.
     - Reconstruction quality metrics (reprojection error, inlier ratio, etc.).
     """
-    try:
-        img1_bytes = await im0.read()
-        img2_bytes = await im1.read()
+    loop = asyncio.get_running_loop()
+    img1_bytes, img2_bytes = await asyncio.gather(im0.read(), im1.read())
+    calib_bytes = await calib.read() if calib is not None else None
+
+    cache_key = _cache_key(img1_bytes, img2_bytes, calib_bytes, detector.encode())
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logger.info("Returning cached reconstruction.")
+        return ORJSONResponse(content=cached)
 
-        img1 = bytes_to_bgr(img1_bytes)
-        img2 = bytes_to_bgr(img2_bytes)
+    try:
+        # Decode in worker threads so large images don't block the event loop
+        img1, img2 = await asyncio.gather(
+            loop.run_in_executor(None, bytes_to_bgr, img1_bytes, DECODE_REDUCTION),
+            loop.run_in_executor(None, bytes_to_bgr, img2_bytes, DECODE_REDUCTION),
+        )
     except Exception as exc:
         raise HTTPException(status_code=422, detail=f"Image decoding failed: {exc}") from exc
 
     # Resolve intrinsic matrices
     try:
-        if calib is not None:
-            calib_text = (await calib.read()).decode("utf-8")
-            K1, K2 = parse_middlebury_calib(calib_text)
+        if calib_bytes is not None:
+            K1, K2 = parse_middlebury_calib(calib_bytes.decode("utf-8"))
+            if DECODE_REDUCTION != 1:
+                # Calibration refers to the full-resolution images
+                K1 = scale_intrinsics(K1, 1.0 / DECODE_REDUCTION)
+                K2 = scale_intrinsics(K2, 1.0 / DECODE_REDUCTION)
         else:
             logger.warning("No calibration file provided; estimating intrinsics from image size.")
             K1 = estimate_intrinsics(img1)
@@ -52,14 +190,23 @@ async def reconstruct(
     except Exception as exc:
         raise HTTPException(status_code=422, detail=f"Calibration parsing failed: {exc}") from exc
 
-    # Run reconstruction
+    # Run reconstruction in the process pool
+    pool = get_pool()
     try:
-        rec = Reconstruction3D(K1, K2)
-        result = rec.run(img1, img2)
+        result = await loop.run_in_executor(pool, run_reconstruction, K1, K2, img1, img2, detector)
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except BrokenProcessPool as exc:
+        # A worker died (e.g. killed for memory); replace the pool for later requests
+        logger.exception("Reconstruction worker pool is broken; restarting it")
+        _discard_broken_pool(pool)
+        raise HTTPException(status_code=500, detail="Reconstruction worker crashed.") from exc
     except Exception as exc:
         logger.exception("Unexpected error during reconstruction")
         raise HTTPException(status_code=500, detail=f"Reconstruction failed: {exc}") from exc
 
-    return ReconstructionResponse(**result)
+    _cache_put(cache_key, result)
+
+    # Serialise the NumPy point cloud directly with orjson; building the
+    # Pydantic model would first expand it into N×3 Python floats.
+    return ORJSONResponse(content=result)
@@ -1,275 +1,370 @@
 """Core 3D reconstruction pipeline.
 
-Implements stereo 3D reconstruction using:
-  - SIFT feature detection and FLANN-based matching
-  - RANSAC fundamental matrix estimation
+Implements stereo 3D reconstruction as a chain of stateless functions using:
+  - SIFT feature detection and FLANN-based matching (ORB + Hamming opt-in)
+  - RANSAC (MAGSAC++) fundamental matrix estimation
   - Direct Linear Transformation (DLT) triangulation
   - Reprojection-error metrics
 
-Ported and extended from the original 3d-recon/three_dim_rec.py script.
+Each stage takes and returns plain arrays; :func:`run_reconstruction` wires
+them together.  Ported and extended from the original
+3d-recon/three_dim_rec.py script.
 """
 
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
 
 import cv2
 import numpy as np
-from scipy import linalg
 
 logger = logging.getLogger(__name__)
 
+Detector = Literal["SIFT", "ORB"]
 
-class Reconstruction3D:
-    """Stereo 3D reconstruction via SIFT matching and DLT triangulation.
+# ---------------------------------------------------------------------------
+# Shared feature extractor and matchers
+# ---------------------------------------------------------------------------
+# These are costly to construct, so they are created once and reused across
+# requests.  OpenCV does not guarantee thread safety, hence the locks.
 
-    Attributes:
-        K1, K2: 3×3 intrinsic camera matrices.
-        fund: Fundamental matrix estimated by RANSAC.
-        proj1, proj2: 3×4 projection matrices for camera 1 and camera 2.
-        imgPts1, imgPts2: Inlier matched keypoints (pixel coords before
-            normalisation; normalised camera coords after).
-        TriPts: Nx3 array of triangulated 3D points.
-        colors: Nx3 array of per-point RGB colours (normalised 0–1).
-        num_raw_matches: Number of good SIFT matches after ratio test.
-        num_inliers: Number of inlier matches after RANSAC filtering.
+FLANN_INDEX_KDTREE = 1
+
+# Descriptor sets at or below this size are matched by exact brute-force L2,
+# which is deterministic and skips the kd-tree build.  0 disables it.
+BF_MAX_DESCRIPTORS = int(os.getenv("RECON_BF_MAX_DESCRIPTORS", "2000"))
+
+# Images whose longer side exceeds this are downscaled before feature detection,
+# bounding detection cost on large inputs.  0 disables downscaling.
+MAX_FEATURE_DIM = int(os.getenv("RECON_MAX_FEATURE_DIM", "1600"))
+
+ORB_MAX_FEATURES = 5000
+
+# One extractor per image of the pair so both can be processed concurrently
+_EXTRACTORS = {
+    "SIFT": (cv2.SIFT_create(), cv2.SIFT_create()),
+    "ORB": (cv2.ORB.create(nfeatures=ORB_MAX_FEATURES), cv2.ORB.create(nfeatures=ORB_MAX_FEATURES)),
+}
+_EXTRACTOR_LOCKS = {name: (threading.Lock(), threading.Lock()) for name in _EXTRACTORS}
+
+_FLANN = cv2.FlannBasedMatcher(dict(algorithm=FLANN_INDEX_KDTREE, trees=5), dict(checks=50))
+_BF = cv2.BFMatcher(cv2.NORM_L2, crossCheck=False)
+# Binary ORB descriptors: XOR + popcount distance, always brute force
+_BF_HAMMING = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
+_MATCHER_LOCK = threading.Lock()
+
+_FUNDAMENTAL_METHOD = cv2.USAC_MAGSAC if hasattr(cv2, "USAC_MAGSAC") else cv2.FM_RANSAC
+
+
+def _downscale_for_features(gray: np.ndarray) -> tuple[np.ndarray, float]:
+    """Shrink a grayscale image to at most MAX_FEATURE_DIM on its longer side.
+
+    Returns:
+        The (possibly) resized image and the scale factor applied to it.
     """
+    longest = max(gray.shape[:2])
+    if not MAX_FEATURE_DIM or longest <= MAX_FEATURE_DIM:
+        return gray, 1.0
+    scale = MAX_FEATURE_DIM / longest
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA), scale
+
+
+def _to_full_res(pts: np.ndarray, scale: float) -> np.ndarray:
+    """Map keypoints detected on a downscaled image back to full-resolution pixels."""
+    if scale == 1.0:
+        return pts
+    # cv2.resize aligns pixel centres, hence the half-pixel shifts
+    return (pts + 0.5) / scale - 0.5
+
 
-    def __init__(self, K1: np.ndarray, K2: np.ndarray) -> None:
-        self.K1 = K1
-        self.K2 = K2
-
-        self.EssR1: np.ndarray | None = None
-        self.EssR2: np.ndarray | None = None
-        self.Ess_t: np.ndarray | None = None
-        self.fund: np.ndarray | None = None
-        self.proj1: np.ndarray | None = None
-        self.proj2: np.ndarray | None = None
-        self.imgPts1: np.ndarray | None = None
-        self.imgPts2: np.ndarray | None = None
-        self.TriPts: np.ndarray | None = None
-        self.colors: np.ndarray | None = None
-
-        self.num_raw_matches: int = 0
-        self.num_inliers: int = 0
-
-    # ------------------------------------------------------------------
-    # Feature matching
-    # ------------------------------------------------------------------
-
-    def process_img_pair(self, img1: np.ndarray, img2: np.ndarray) -> None:
-        """Detect SIFT features, match them, and estimate the fundamental matrix.
-
-        Args:
-            img1: Left image in BGR format (H×W×3 uint8).
-            img2: Right image in BGR format (H×W×3 uint8).
-        """
-        gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
-        gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
-
-        sift = cv2.SIFT_create()
-        kps1, desc1 = sift.detectAndCompute(gray1, None)
-        kps2, desc2 = sift.detectAndCompute(gray2, None)
-
-        if desc1 is None or desc2 is None or len(kps1) < 8 or len(kps2) < 8:
-            raise ValueError("Insufficient keypoints detected. Ensure images have clear texture.")
-
-        # FLANN matcher
-        FLANN_INDEX_KDTREE = 1
-        index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
-        search_params = dict(checks=50)
-        flann = cv2.FlannBasedMatcher(index_params, search_params)
-        matches = flann.knnMatch(desc1, desc2, k=2)
-
-        # Lowe's ratio test
-        good: list = []
-        imgPts1: list = []
-        imgPts2: list = []
-        for m, n in matches:
-            if m.distance < 0.7 * n.distance:
-                good.append(m)
-                imgPts1.append(kps1[m.queryIdx].pt)
-                imgPts2.append(kps2[m.trainIdx].pt)
-
-        self.num_raw_matches = len(good)
-        logger.info("SIFT good matches after ratio test: %d", self.num_raw_matches)
-
-        if self.num_raw_matches < 8:
-            raise ValueError(
-                f"Too few good matches ({self.num_raw_matches}). "
-                "Need at least 8 for fundamental matrix estimation."
-            )
-
-        pts1 = np.float32(imgPts1)
-        pts2 = np.float32(imgPts2)
-
-        # Estimate fundamental matrix with RANSAC
-        F, mask = cv2.findFundamentalMat(pts1, pts2, cv2.FM_RANSAC, 3.0, 0.99)
-        if F is None:
-            raise ValueError("Fundamental matrix estimation failed.")
-
-        self.fund = F
-        mask_flat = mask.ravel().astype(bool)
-        self.imgPts1 = pts1[mask_flat]
-        self.imgPts2 = pts2[mask_flat]
-        self.num_inliers = int(mask_flat.sum())
-        logger.info("Inliers after RANSAC: %d / %d", self.num_inliers, self.num_raw_matches)
-
-        # Extract pixel colours from img1 at inlier keypoint locations
-        colors: list = []
-        h, w = img1.shape[:2]
-        for pt in self.imgPts1:
-            x = int(np.clip(pt[0], 0, w - 1))
-            y = int(np.clip(pt[1], 0, h - 1))
-            b, g, r = img1[y, x]
-            colors.append([r / 255.0, g / 255.0, b / 255.0])
-        self.colors = np.array(colors, dtype=np.float32)
-
-    # ------------------------------------------------------------------
-    # Projection matrix computation
-    # ------------------------------------------------------------------
-
-    def _estimate_essential_matrix(self) -> np.ndarray:
-        """Derive essential matrix from the fundamental matrix and intrinsics."""
-        return self.K1.T @ self.fund @ self.K2
-
-    def compute_proj_matrices(self, pixel_pts1: np.ndarray, pixel_pts2: np.ndarray) -> None:
-        """Compute 3×4 projection matrices for both cameras.
-
-        Uses cv2.recoverPose (cheirality check) to select the correct (R, t)
-        from the four essential-matrix solutions.  Projection matrices do NOT
-        include K because the DLT operates on normalised camera coordinates.
-
-        Args:
-            pixel_pts1: Inlier keypoints in camera-1 pixel space (N, 2).
-            pixel_pts2: Inlier keypoints in camera-2 pixel space (N, 2).
-        """
-        # Camera 1 at world origin
-        self.proj1 = np.hstack((np.eye(3), np.zeros((3, 1))))
-
-        # Use recoverPose to disambiguate the four (R, t) candidates via
-        # the cheirality constraint (points must be in front of both cameras).
-        E = self._estimate_essential_matrix()
-        _, R, t, _ = cv2.recoverPose(E, pixel_pts1, pixel_pts2, self.K1)
-        self.EssR2 = R
-        self.Ess_t = t
-        self.proj2 = np.hstack((R, t.reshape(3, 1)))
-
-    # ------------------------------------------------------------------
-    # Keypoint normalisation
-    # ------------------------------------------------------------------
-
-    def normalize_keypts(self) -> None:
-        """Convert matched keypoints from pixel to normalised camera coordinates."""
-        hom1 = cv2.convertPointsToHomogeneous(self.imgPts1).reshape(-1, 3)
-        hom2 = cv2.convertPointsToHomogeneous(self.imgPts2).reshape(-1, 3)
-
-        K1_inv = np.linalg.inv(self.K1)
-        K2_inv = np.linalg.inv(self.K2)
-
-        norm1 = (K1_inv @ hom1.T).T
-        norm2 = (K2_inv @ hom2.T).T
-
-        self.imgPts1 = cv2.convertPointsFromHomogeneous(norm1).reshape(-1, 2)
-        self.imgPts2 = cv2.convertPointsFromHomogeneous(norm2).reshape(-1, 2)
-
-    # ------------------------------------------------------------------
-    # Triangulation
-    # ------------------------------------------------------------------
-
-    def triangulate(self) -> None:
-        """Triangulate matched points via DLT into 3D coordinates."""
-        tris = [self._dlt_triangulate(p1, p2) for p1, p2 in zip(self.imgPts1, self.imgPts2)]
-        self.TriPts = np.vstack(tris)
-
-    def _dlt_triangulate(self, pt1: np.ndarray, pt2: np.ndarray) -> np.ndarray:
-        """Return a 3D point by DLT for one pair of correspondences.
-
-        Args:
-            pt1: 2D point in normalised camera 1 coordinates.
-            pt2: 2D point in normalised camera 2 coordinates.
-
-        Returns:
-            Non-homogeneous 3D point [X, Y, Z].
-        """
-        P1, P2 = self.proj1, self.proj2
-        A = np.array(
-            [
-                pt1[1] * P1[2, :] - P1[1, :],
-                P1[0, :] - pt1[0] * P1[2, :],
-                pt2[1] * P2[2, :] - P2[1, :],
-                P2[0, :] - pt2[0] * P2[2, :],
-            ]
+def _extract_features(
+    detector: Detector, index: int, img: np.ndarray
+) -> tuple[tuple, np.ndarray | None, float]:
+    """Detect keypoints and descriptors on one image of the pair.
+
+    Args:
+        detector: Feature detector to use.
+        index: Position of the image in the pair (0 or 1), selecting its extractor.
+        img: Image in BGR format (H×W×3 uint8).
+
+    Returns:
+        Keypoints, descriptors and the downscaling factor applied before detection.
+    """
+    gray, scale = _downscale_for_features(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+    with _EXTRACTOR_LOCKS[detector][index]:
+        kps, desc = _EXTRACTORS[detector][index].detectAndCompute(gray, None)
+    return kps, desc, scale
+
+
+# ---------------------------------------------------------------------------
+# Feature matching
+# ---------------------------------------------------------------------------
+
+
+def match_features(
+    img1: np.ndarray, img2: np.ndarray, detector: Detector = "SIFT"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Detect and match features, keeping pairs that pass Lowe's ratio test.
+
+    Args:
+        img1: Left image in BGR format (H×W×3 uint8).
+        img2: Right image in BGR format (H×W×3 uint8).
+        detector: ``"SIFT"`` (default) or the faster but less accurate
+            ``"ORB"`` with Hamming-distance matching.
+
+    Returns:
+        Matched keypoints ``(pts1, pts2)`` in full-resolution pixel
+        coordinates, each of shape (N, 2) float32.
+    """
+    if detector not in _EXTRACTORS:
+        raise ValueError(f"Unknown detector {detector!r}; expected one of {list(_EXTRACTORS)}.")
+
+    # OpenCV releases the GIL during detection, so both images run in parallel
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        fut1 = executor.submit(_extract_features, detector, 0, img1)
+        fut2 = executor.submit(_extract_features, detector, 1, img2)
+        kps1, desc1, scale1 = fut1.result()
+        kps2, desc2, scale2 = fut2.result()
+
+    if desc1 is None or desc2 is None or len(kps1) < 8 or len(kps2) < 8:
+        raise ValueError("Insufficient keypoints detected. Ensure images have clear texture.")
+
+    # ORB: brute-force Hamming.  SIFT: FLANN kd-tree, or exact brute-force L2
+    # for small descriptor sets
+    matcher: cv2.DescriptorMatcher
+    if detector == "ORB":
+        matcher = _BF_HAMMING
+    elif max(len(desc1), len(desc2)) <= BF_MAX_DESCRIPTORS:
+        matcher = _BF
+    else:
+        matcher = _FLANN
+    with _MATCHER_LOCK:
+        matches = matcher.knnMatch(desc1, desc2, k=2)
+
+    # Lowe's ratio test, vectorised over all pairs that have two neighbours
+    matches = [pair for pair in matches if len(pair) == 2]
+    dists = np.array([[m.distance, n.distance] for m, n in matches], dtype=np.float32)
+    dists = dists.reshape(-1, 2)
+    keep = dists[:, 0] < 0.7 * dists[:, 1]
+    query_idx = np.fromiter((m.queryIdx for m, _ in matches), np.int32, len(matches))[keep]
+    train_idx = np.fromiter((m.trainIdx for m, _ in matches), np.int32, len(matches))[keep]
+    logger.info("%s good matches after ratio test: %d", detector, len(query_idx))
+
+    if len(query_idx) < 8:
+        raise ValueError(
+            f"Too few good matches ({len(query_idx)}). "
+            "Need at least 8 for fundamental matrix estimation."
         )
-        B = A.T @ A
-        _, _, Vh = linalg.svd(B, full_matrices=False)
-        return Vh[3, :3] / Vh[3, 3]
-
-    # ------------------------------------------------------------------
-    # Metrics
-    # ------------------------------------------------------------------
-
-    def compute_reproj_error(self, pixel_pts2: np.ndarray) -> float:
-        """Return RMSE reprojection error onto the camera-2 image plane (pixels).
-
-        Args:
-            pixel_pts2: Original pixel-coordinate correspondences in camera 2
-                        (before normalisation). Shape (N, 2).
-        """
-        rot_vec, _ = cv2.Rodrigues(self.EssR2)
-        proj_pts, _ = cv2.projectPoints(self.TriPts, rot_vec, self.Ess_t, self.K2, None)
-        residuals = pixel_pts2 - proj_pts.reshape(-1, 2)
-        return float(np.mean(np.sqrt(np.sum(residuals**2, axis=-1))))
-
-    def get_baseline_length(self) -> float:
-        """Return the magnitude of the camera-to-camera translation vector."""
-        return float(np.linalg.norm(self.Ess_t))
-
-    # ------------------------------------------------------------------
-    # Main entry point
-    # ------------------------------------------------------------------
-
-    def run(self, img1: np.ndarray, img2: np.ndarray) -> dict:
-        """Execute the full reconstruction pipeline.
-
-        Args:
-            img1: Left stereo image (BGR uint8).
-            img2: Right stereo image (BGR uint8).
-
-        Returns:
-            Dictionary with keys ``points``, ``colors``, and ``metrics``.
-        """
-        self.process_img_pair(img1, img2)
-        # Save pixel-coord keypoints before normalisation for:
-        #   (a) recoverPose cheirality check inside compute_proj_matrices
-        #   (b) reprojection error comparison against pixel-space projections
-        raw_pts1 = self.imgPts1.copy()
-        raw_pts2 = self.imgPts2.copy()
-
-        # recoverPose needs pixel coords, so call before normalize_keypts
-        self.compute_proj_matrices(raw_pts1, raw_pts2)
-        self.normalize_keypts()
-        self.triangulate()
-
-        # Reprojection error: project 3D points back to camera-2 pixel space
-        # and compare with the original pixel-coord correspondences (raw_pts2).
-        rot_vec, _ = cv2.Rodrigues(self.EssR2)
-        proj_pts, _ = cv2.projectPoints(self.TriPts, rot_vec, self.Ess_t, self.K2, None)
-        residuals = raw_pts2 - proj_pts.reshape(-1, 2)
-        reproj_rmse = float(np.mean(np.sqrt(np.sum(residuals**2, axis=-1))))
-
-        depths = self.TriPts[:, 2]
-        metrics = {
-            "reprojection_rmse": reproj_rmse,
-            "num_keypoints_matched": self.num_raw_matches,
-            "num_inliers": self.num_inliers,
-            "inlier_ratio": round(self.num_inliers / max(self.num_raw_matches, 1), 4),
-            "num_3d_points": len(self.TriPts),
-            "baseline_length": self.get_baseline_length(),
-            "mean_depth": float(np.mean(depths)),
-            "depth_range": float(np.max(depths) - np.min(depths)),
-        }
-
-        return {
-            "points": self.TriPts.tolist(),
-            "colors": self.colors.tolist(),
-            "metrics": metrics,
-        }
+
+    # Keypoints are mapped back to full resolution, so K and colour lookups
+    # downstream apply unchanged
+    pts1 = _to_full_res(np.array([kp.pt for kp in kps1], dtype=np.float32)[query_idx], scale1)
+    pts2 = _to_full_res(np.array([kp.pt for kp in kps2], dtype=np.float32)[train_idx], scale2)
+    return pts1, pts2
+
+
+def sample_colors(img: np.ndarray, pts: np.ndarray) -> np.ndarray:
+    """Return per-point RGB colours (normalised 0–1) of a BGR image at pixel coords.
+
+    Args:
+        img: Image in BGR format (H×W×3 uint8).
+        pts: Pixel coordinates, shape (N, 2).
+
+    Returns:
+        Nx3 float32 array of RGB colours.
+    """
+    h, w = img.shape[:2]
+    xy = pts.astype(np.int32)
+    np.clip(xy[:, 0], 0, w - 1, out=xy[:, 0])
+    np.clip(xy[:, 1], 0, h - 1, out=xy[:, 1])
+    bgr = img[xy[:, 1], xy[:, 0]]
+    # Swap BGR → RGB and normalise to [0, 1] in one pass
+    return bgr[:, ::-1].astype(np.float32) * np.float32(1.0 / 255.0)
+
+
+# ---------------------------------------------------------------------------
+# Pose estimation
+# ---------------------------------------------------------------------------
+
+
+def normalize_points(pts: np.ndarray, K: np.ndarray) -> np.ndarray:
+    """Convert pixel coordinates to normalised camera coordinates.
+
+    Solves ``K x = [u, v, 1]ᵀ`` by back-substitution on the upper-triangular
+    K rather than forming ``K⁻¹``: ``y = (v - cy) / fy`` and
+    ``x = (u - cx) / fx - (s / fx) y``.  With zero skew ``s`` this is a
+    single subtract-and-divide.
+
+    Args:
+        pts: Pixel coordinates, shape (N, 2).
+        K: 3×3 intrinsic matrix.
+
+    Returns:
+        Normalised coordinates, shape (N, 2) float64.
+    """
+    norm = (pts - K[:2, 2]) / np.array([K[0, 0], K[1, 1]])
+    if K[0, 1]:
+        norm[:, 0] -= (K[0, 1] / K[0, 0]) * norm[:, 1]
+    return norm
+
+
+def estimate_pose(
+    pts1: np.ndarray, pts2: np.ndarray, K1: np.ndarray, K2: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Estimate the fundamental matrix and the relative pose of camera 2.
+
+    F is fitted with MAGSAC++ (USAC), or legacy RANSAC on OpenCV builds that
+    predate the USAC framework.  ``findFundamentalMat(pts1, pts2)`` yields F
+    with ``x2ᵀ F x1 = 0``, so ``E = K2ᵀ F K1``.  cv2.recoverPose then selects
+    the (R, t) candidate that passes the cheirality check; it runs on
+    normalised coordinates with an identity camera matrix, which stays
+    correct when K1 ≠ K2.
+
+    Args:
+        pts1: Matched keypoints in camera-1 pixel space, shape (N, 2).
+        pts2: Matched keypoints in camera-2 pixel space, shape (N, 2).
+        K1, K2: 3×3 intrinsic matrices.
+
+    Returns:
+        ``(R, t, F, inlier_pts1, inlier_pts2)``: rotation (3×3) and unit
+        translation (3,) of camera 2 relative to camera 1, the fundamental
+        matrix, and the RANSAC inliers in pixel coordinates.
+    """
+    F, mask = cv2.findFundamentalMat(
+        pts1,
+        pts2,
+        method=_FUNDAMENTAL_METHOD,
+        ransacReprojThreshold=1.0,
+        confidence=0.999,
+        maxIters=10000,
+    )
+    if F is None or mask is None:
+        raise ValueError("Fundamental matrix estimation failed.")
+
+    inliers = mask.ravel().astype(bool)
+    inlier_pts1 = pts1[inliers]
+    inlier_pts2 = pts2[inliers]
+    logger.info("Inliers after RANSAC: %d / %d", len(inlier_pts1), len(pts1))
+
+    E = K2.T @ F @ K1
+    _, R, t, _ = cv2.recoverPose(
+        E, normalize_points(inlier_pts1, K1), normalize_points(inlier_pts2, K2), np.eye(3)
+    )
+    return R, t.reshape(3), F, inlier_pts1, inlier_pts2
+
+
+# ---------------------------------------------------------------------------
+# Triangulation
+# ---------------------------------------------------------------------------
+
+
+def triangulate_all(
+    P1: np.ndarray, P2: np.ndarray, pts1: np.ndarray, pts2: np.ndarray
+) -> np.ndarray:
+    """Triangulate all correspondences via batched DLT into 3D coordinates.
+
+    The N linear systems are stacked into a single (N, 4, 4) tensor and
+    solved with one batched SVD of ``A``; the right singular vector of the
+    smallest singular value is the homogeneous 3D point.  Decomposing ``A``
+    directly avoids squaring its condition number via ``AᵀA``.
+
+    Args:
+        P1, P2: 3×4 projection matrices.
+        pts1, pts2: Corresponding image points for P1 and P2, shape (N, 2).
+
+    Returns:
+        Nx3 float32 array of 3D points.
+    """
+    x1, y1 = pts1[:, 0:1], pts1[:, 1:2]
+    x2, y2 = pts2[:, 0:1], pts2[:, 1:2]
+    A = np.stack(
+        (
+            y1 * P1[2] - P1[1],
+            P1[0] - x1 * P1[2],
+            y2 * P2[2] - P2[1],
+            P2[0] - x2 * P2[2],
+        ),
+        axis=1,
+    )
+    _, _, Vh = np.linalg.svd(A)
+    X = Vh[:, 3]
+    # float32 is ample for a point cloud and halves the serialised payload
+    return (X[:, :3] / X[:, 3:]).astype(np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+def reproj_rmse(
+    pts3d: np.ndarray, pts2: np.ndarray, R: np.ndarray, t: np.ndarray, K2: np.ndarray
+) -> float:
+    """Return RMSE reprojection error onto the camera-2 image plane (pixels).
+
+    Args:
+        pts3d: Nx3 triangulated points in camera-1 coordinates.
+        pts2: Observed pixel-coordinate correspondences in camera 2, shape (N, 2).
+        R, t: Pose of camera 2 relative to camera 1.
+        K2: 3×3 intrinsic matrix of camera 2.
+    """
+    rot_vec, _ = cv2.Rodrigues(R)
+    proj_pts, _ = cv2.projectPoints(pts3d, rot_vec, t, K2, None)
+    residuals = pts2 - proj_pts.reshape(-1, 2)
+    return float(np.sqrt(np.mean(np.sum(residuals**2, axis=-1))))
+
+
+# ---------------------------------------------------------------------------
+# Main entry point
+# ---------------------------------------------------------------------------
+
+
+def run_reconstruction(
+    K1: np.ndarray,
+    K2: np.ndarray,
+    img1: np.ndarray,
+    img2: np.ndarray,
+    detector: Detector = "SIFT",
+) -> dict:
+    """Execute the full reconstruction pipeline on one stereo pair.
+
+    A module-level function so it can be pickled and dispatched to a worker
+    process.
+
+    Args:
+        K1, K2: 3×3 intrinsic camera matrices.
+        img1: Left stereo image (BGR uint8).
+        img2: Right stereo image (BGR uint8).
+        detector: ``"SIFT"`` (default) or ``"ORB"``.
+
+    Returns:
+        Dictionary with keys ``points`` and ``colors`` (Nx3 NumPy arrays)
+        and ``metrics``.
+    """
+    matched1, matched2 = match_features(img1, img2, detector)
+    R, t, _, pts1, pts2 = estimate_pose(matched1, matched2, K1, K2)
+
+    # Projection matrices exclude K: the DLT runs on normalised coordinates
+    P1 = np.hstack((np.eye(3), np.zeros((3, 1))))
+    P2 = np.hstack((R, t.reshape(3, 1)))
+    pts3d = triangulate_all(P1, P2, normalize_points(pts1, K1), normalize_points(pts2, K2))
+
+    depths = pts3d[:, 2]
+    metrics = {
+        "reprojection_rmse": reproj_rmse(pts3d, pts2, R, t, K2),
+        "num_keypoints_matched": len(matched1),
+        "num_inliers": len(pts1),
+        "inlier_ratio": round(len(pts1) / max(len(matched1), 1), 4),
+        "num_3d_points": len(pts3d),
+        "baseline_length": float(np.linalg.norm(t)),
+        "mean_depth": float(np.mean(depths)),
+        "depth_range": float(np.max(depths) - np.min(depths)),
+    }
+
+    return {
+        "points": np.ascontiguousarray(pts3d),
+        "colors": np.ascontiguousarray(sample_colors(img1, pts1)),
+        "metrics": metrics,
+    }
@@ -3,6 +3,18 @@ import re
 import cv2
 import numpy as np
 
+_MAT_RE = re.compile(r"\[(.+)\]")
+
+# imdecode flags for each supported downscale factor.  JPEG decodes these at
+# reduced size in the DCT domain; other formats are resized after decoding.
+_REDUCED_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+DECODE_REDUCTIONS = tuple(_REDUCED_COLOR_FLAGS)
+
 
 def parse_middlebury_calib(content: str) -> tuple[np.ndarray, np.ndarray]:
     """Parse Middlebury-format calib.txt content into intrinsic matrices.
@@ -20,24 +32,28 @@ def parse_middlebury_calib(content: str) -> tuple[np.ndarray, np.ndarray]:
     lines = content.strip().splitlines()
     matrices = []
     for line in lines[:2]:
-        match = re.search(r"\[(.+)\]", line)
+        match = _MAT_RE.search(line)
         if not match:
             raise ValueError(f"Cannot parse calibration line: {line!r}")
         inner = match.group(1).replace(";", " ")
-        values = [float(v) for v in inner.split()]
-        if len(values) != 9:
-            raise ValueError(f"Expected 9 values in camera matrix, got {len(values)}")
-        matrices.append(np.array(values, dtype=np.float64).reshape(3, 3))
+        try:
+            values = np.array(inner.split(), dtype=np.float64)
+        except ValueError as exc:
+            raise ValueError(f"Non-numeric value in camera matrix: {line!r}") from exc
+        if values.size != 9:
+            raise ValueError(f"Expected 9 values in camera matrix, got {values.size}")
+        matrices.append(values.reshape(3, 3))
     if len(matrices) < 2:
         raise ValueError("Calibration file must contain at least two camera matrices.")
     return matrices[0], matrices[1]
 
 
-def bytes_to_bgr(data: bytes) -> np.ndarray:
+def bytes_to_bgr(data: bytes, reduction: int = 1) -> np.ndarray:
     """Decode raw image bytes into a BGR numpy array (OpenCV format).
 
     Args:
         data: Raw bytes of an image file (PNG, JPEG, etc.).
+        reduction: Downscale factor applied while decoding (1, 2, 4 or 8).
 
     Returns:
         BGR image as a uint8 numpy array of shape (H, W, 3).
@@ -45,13 +61,35 @@ def bytes_to_bgr(data: bytes) -> np.ndarray:
     Raises:
         ValueError: If the bytes cannot be decoded as an image.
     """
+    if reduction not in _REDUCED_COLOR_FLAGS:
+        raise ValueError(f"Unsupported decode reduction {reduction}; expected 1, 2, 4 or 8.")
+    # frombuffer is a zero-copy view of the immutable bytes object
     buf = np.frombuffer(data, dtype=np.uint8)
-    img = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+    img = cv2.imdecode(buf, _REDUCED_COLOR_FLAGS[reduction])
     if img is None:
         raise ValueError("Could not decode image bytes. Ensure the file is a valid image.")
     return img
 
 
+def scale_intrinsics(K: np.ndarray, scale: float) -> np.ndarray:
+    """Return the intrinsic matrix for an image resized by ``scale``.
+
+    Uses the pixel-centre convention of OpenCV resizing, so the principal
+    point maps as ``(c + 0.5) * scale - 0.5``.
+
+    Args:
+        K: 3x3 intrinsic matrix of the original image.
+        scale: Resize factor (e.g. 0.5 for half resolution).
+
+    Returns:
+        New 3x3 intrinsic matrix.
+    """
+    K_scaled = K.astype(np.float64, copy=True)
+    K_scaled[:2, :] *= scale
+    K_scaled[:2, 2] += 0.5 * scale - 0.5
+    return K_scaled
+
+
 def estimate_intrinsics(img: np.ndarray) -> np.ndarray:
     """Estimate a plausible intrinsic matrix from image dimensions.
 
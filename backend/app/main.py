@@ -1,6 +1,8 @@
 """Multiview 3D Reconstruction — FastAPI application entry point."""
 
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,15 +12,25 @@ from app.models.schemas import HealthResponse
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s  %(name)s  %(message)s")
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Start the reconstruction worker pool with the app and stop it on shutdown."""
+    reconstruction.get_pool()
+    yield
+    reconstruction.shutdown_pool()
+
+
 app = FastAPI(
     title="Multiview 3D Reconstruction API",
     description=(
-        "Stereo 3D reconstruction from image pairs using SIFT feature matching, "
+        "Stereo 3D reconstruction from image pairs using SIFT (or ORB) feature matching, "
         "RANSAC fundamental matrix estimation, and DLT triangulation."
     ),
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # ---------------------------------------------------------------------------
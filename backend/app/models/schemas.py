@@ -6,13 +6,13 @@ class ReconstructionMetrics(BaseModel):
         description="Root-mean-square reprojection error in pixels (cam2 plane)."
     )
     num_keypoints_matched: int = Field(
-        description="Number of good SIFT matches after Lowe's ratio test."
+        description="Number of good feature matches after Lowe's ratio test."
     )
     num_inliers: int = Field(
         description="Number of inlier correspondences after RANSAC fundamental matrix estimation."
     )
     inlier_ratio: float = Field(
-        description="Fraction of SIFT matches that survived RANSAC filtering (0–1)."
+        description="Fraction of feature matches that survived RANSAC filtering (0–1)."
     )
     num_3d_points: int = Field(description="Number of successfully triangulated 3D points.")
     baseline_length: float = Field(
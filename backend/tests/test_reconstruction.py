@@ -1,10 +1,30 @@
 """Unit and integration tests for the reconstruction pipeline."""
 
+from collections import OrderedDict
+
+import cv2
 import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
-from app.core.utils import bytes_to_bgr, estimate_intrinsics, parse_middlebury_calib
+from app.api.routes import reconstruction as reconstruction_route
+from app.core import reconstruction as reconstruction_core
+from app.core.reconstruction import (
+    _downscale_for_features,
+    _to_full_res,
+    estimate_pose,
+    match_features,
+    normalize_points,
+    reproj_rmse,
+    sample_colors,
+    triangulate_all,
+)
+from app.core.utils import (
+    bytes_to_bgr,
+    estimate_intrinsics,
+    parse_middlebury_calib,
+    scale_intrinsics,
+)
 from app.main import app
 
 # ---------------------------------------------------------------------------
@@ -51,6 +71,13 @@ def test_parse_middlebury_calib_missing_matrix():
         parse_middlebury_calib("cam0=[1 0 0; 0 1 0; 0 0 1]\n")
 
 
+def test_parse_middlebury_calib_malformed_values():
+    with pytest.raises(ValueError, match="Non-numeric"):
+        parse_middlebury_calib("cam0=[1 0 x; 0 1 0; 0 0 1]\ncam1=[1 0 0; 0 1 0; 0 0 1]\n")
+    with pytest.raises(ValueError, match="Expected 9 values"):
+        parse_middlebury_calib("cam0=[1 0; 0 1]\ncam1=[1 0 0; 0 1 0; 0 0 1]\n")
+
+
 def test_estimate_intrinsics(random_bgr_image):
     K = estimate_intrinsics(random_bgr_image)
     assert K.shape == (3, 3)
@@ -63,6 +90,178 @@ def test_bytes_to_bgr_invalid():
         bytes_to_bgr(b"not an image")
 
 
+def test_bytes_to_bgr_reduced(random_bgr_image):
+    ok, png = cv2.imencode(".png", random_bgr_image)
+    assert ok
+    assert bytes_to_bgr(png.tobytes(), reduction=2).shape == (100, 150, 3)
+    with pytest.raises(ValueError, match="Unsupported decode reduction"):
+        bytes_to_bgr(png.tobytes(), reduction=3)
+
+
+def test_scale_intrinsics():
+    K_half = scale_intrinsics(K_EXPECTED, 0.5)
+    assert K_half[0, 0] == pytest.approx(K_EXPECTED[0, 0] / 2)
+    assert K_half[1, 2] == pytest.approx((K_EXPECTED[1, 2] + 0.5) / 2 - 0.5)
+    assert K_half[2, 2] == 1.0
+
+
+# ---------------------------------------------------------------------------
+# Reconstruction core
+# ---------------------------------------------------------------------------
+
+
+def test_triangulate_all_recovers_synthetic_points():
+    """Batched DLT must recover 3D points from exact normalised projections."""
+    rng = np.random.default_rng(0)
+    pts3d = rng.uniform([-2, -2, 5], [2, 2, 15], (50, 3))
+
+    angle = np.deg2rad(5)
+    R = np.array([[np.cos(angle), 0, np.sin(angle)], [0, 1, 0], [-np.sin(angle), 0, np.cos(angle)]])
+    t = np.array([-1.0, 0.0, 0.0])
+
+    P1 = np.hstack((np.eye(3), np.zeros((3, 1))))
+    P2 = np.hstack((R, t.reshape(3, 1)))
+    cam2 = pts3d @ R.T + t
+    tri = triangulate_all(P1, P2, pts3d[:, :2] / pts3d[:, 2:], cam2[:, :2] / cam2[:, 2:])
+
+    assert tri.shape == (50, 3)
+    assert tri.dtype == np.float32
+    np.testing.assert_allclose(tri, pts3d, rtol=1e-5)
+
+
+def test_triangulate_all_matches_opencv_on_noisy_points():
+    """Batched DLT must agree with cv2.triangulatePoints when observations are noisy."""
+    rng = np.random.default_rng(2)
+    pts3d = rng.uniform([-2, -2, 5], [2, 2, 15], (200, 3))
+    t = np.array([-1.0, 0.0, 0.0])
+
+    P1 = np.hstack((np.eye(3), np.zeros((3, 1))))
+    P2 = np.hstack((np.eye(3), t.reshape(3, 1)))
+    cam2 = pts3d + t
+    pts1 = pts3d[:, :2] / pts3d[:, 2:] + rng.normal(0, 1e-3, (200, 2))
+    pts2 = cam2[:, :2] / cam2[:, 2:] + rng.normal(0, 1e-3, (200, 2))
+    tri = triangulate_all(P1, P2, pts1, pts2)
+
+    hom = cv2.triangulatePoints(P1, P2, pts1.T, pts2.T)
+    np.testing.assert_allclose(tri, (hom[:3] / hom[3:]).T, rtol=1e-5)
+
+
+def test_estimate_pose_with_distinct_intrinsics():
+    """recoverPose must return the true (R, t) even when K1 and K2 differ."""
+    rng = np.random.default_rng(1)
+    pts3d = rng.uniform([-2, -2, 5], [2, 2, 15], (100, 3))
+    angle = np.deg2rad(3)
+    R = np.array([[np.cos(angle), 0, np.sin(angle)], [0, 1, 0], [-np.sin(angle), 0, np.cos(angle)]])
+    t = np.array([-1.0, 0.0, 0.0])
+    K2 = K_EXPECTED.copy()
+    K2[0, 2] += 175.0
+
+    def project(K, cam_pts):
+        pix = (K @ cam_pts.T).T
+        return (pix[:, :2] / pix[:, 2:]).astype(np.float32)
+
+    pts1 = project(K_EXPECTED, pts3d)
+    pts2 = project(K2, pts3d @ R.T + t)
+    R_est, t_est, F, inliers1, inliers2 = estimate_pose(pts1, pts2, K_EXPECTED, K2)
+
+    assert F.shape == (3, 3)
+    assert len(inliers1) == len(inliers2) > 90
+    np.testing.assert_allclose(R_est, R, atol=1e-3)
+    np.testing.assert_allclose(t_est, t, atol=1e-3)
+
+
+def test_match_features_unknown_detector(random_bgr_image):
+    with pytest.raises(ValueError, match="Unknown detector"):
+        match_features(random_bgr_image, random_bgr_image, detector="SURF")
+
+
+def test_match_features_orb_recovers_known_shift(monkeypatch):
+    """ORB + Hamming matching must recover the translation between two crops."""
+    # The float-descriptor matchers must not be touched on the ORB path
+    monkeypatch.setattr(reconstruction_core, "_FLANN", None)
+    monkeypatch.setattr(reconstruction_core, "_BF", None)
+
+    rng = np.random.default_rng(3)
+    texture = rng.integers(0, 256, (60, 80), dtype=np.uint8)
+    texture = cv2.resize(texture, (640, 480), interpolation=cv2.INTER_NEAREST)
+    img = cv2.cvtColor(cv2.GaussianBlur(texture, (3, 3), 0), cv2.COLOR_GRAY2BGR)
+    # Scene content appears 12 px right and 7 px down in the second crop
+    img1 = np.ascontiguousarray(img[20:420, 30:590])
+    img2 = np.ascontiguousarray(img[13:413, 18:578])
+
+    pts1, pts2 = match_features(img1, img2, detector="ORB")
+
+    assert len(pts1) == len(pts2) >= 100
+    offsets = pts2 - pts1
+    np.testing.assert_allclose(np.median(offsets, axis=0), [12.0, 7.0], atol=0.5)
+    assert np.mean(np.all(np.abs(offsets - [12.0, 7.0]) < 1.0, axis=1)) > 0.5
+
+
+def test_sample_colors_clips_and_converts_to_rgb(random_bgr_image):
+    pts = np.float32([[10.7, 20.2], [-5.0, 500.0]])
+    colors = sample_colors(random_bgr_image, pts)
+
+    assert colors.dtype == np.float32
+    np.testing.assert_allclose(colors[0], random_bgr_image[20, 10, ::-1] / 255.0, rtol=1e-6)
+    np.testing.assert_allclose(colors[1], random_bgr_image[199, 0, ::-1] / 255.0, rtol=1e-6)
+
+
+def test_downscaled_keypoints_map_back_to_full_resolution(monkeypatch):
+    """Features found on a downscaled image must land on their full-res pixel positions."""
+    monkeypatch.setattr(reconstruction_core, "MAX_FEATURE_DIM", 150)
+    gray = np.zeros((200, 300), dtype=np.uint8)
+    gray[60:62, 100:102] = 255  # 2×2 blob centred on full-res (100.5, 60.5)
+
+    small, scale = _downscale_for_features(gray)
+    assert scale == 0.5
+    assert small.shape == (100, 150)
+
+    # INTER_AREA collapses the blob onto the single small pixel (50, 30)
+    y, x = np.unravel_index(np.argmax(small), small.shape)
+    assert (x, y) == (50, 30)
+    full = _to_full_res(np.float32([[x, y]]), scale)
+    np.testing.assert_allclose(full, [[100.5, 60.5]])
+
+    # Forward pixel-centre mapping round-trips exactly
+    pts = np.float32([[0.0, 0.0], [123.25, 45.5], [299.0, 199.0]])
+    np.testing.assert_allclose(_to_full_res((pts + 0.5) * scale - 0.5, scale), pts, atol=1e-5)
+
+
+def test_downscale_is_noop_for_small_images(monkeypatch):
+    monkeypatch.setattr(reconstruction_core, "MAX_FEATURE_DIM", 300)
+    gray = np.zeros((200, 300), dtype=np.uint8)
+    small, scale = _downscale_for_features(gray)
+    assert small is gray
+    assert scale == 1.0
+
+    pts = np.float32([[1.5, 2.5]])
+    assert _to_full_res(pts, 1.0) is pts
+
+
+def test_normalize_points_matches_inverse_intrinsics():
+    K2 = K_EXPECTED.copy()
+    K2[0, 1] = 2.5  # non-zero skew
+    K2[0, 2] += 150.0
+    pts = np.float32([[0, 0], [1176.728, 1011.728], [2000.5, 40.25]])
+
+    hom = np.hstack((pts, np.ones((3, 1))))
+    for K in (K_EXPECTED, K2):
+        expected = (np.linalg.inv(K) @ hom.T).T[:, :2]
+        np.testing.assert_allclose(normalize_points(pts, K), expected, rtol=1e-6, atol=1e-9)
+
+
+def test_reproj_rmse_is_root_mean_square():
+    """Residuals of 5 px and 0 px must give sqrt(mean(25, 0)), not mean(5, 0)."""
+    t = np.array([-1.0, 0.0, 0.0])
+    pts3d = np.array([[0.5, 0.2, 10.0], [-0.3, 0.1, 8.0]])
+
+    pixels = (K_EXPECTED @ (pts3d + t).T).T
+    pts2 = pixels[:, :2] / pixels[:, 2:]
+    pts2[0] += [3.0, 4.0]
+
+    assert reproj_rmse(pts3d, pts2, np.eye(3), t, K_EXPECTED) == pytest.approx(np.sqrt(12.5))
+
+
 # ---------------------------------------------------------------------------
 # API health check
 # ---------------------------------------------------------------------------
@@ -95,3 +294,58 @@ def test_reconstruct_invalid_image(client):
     }
     resp = client.post("/api/reconstruct", files=files)
     assert resp.status_code == 422
+
+
+def test_reconstruct_returns_cached_result(client, monkeypatch):
+    """A repeated upload must be answered from the cache without re-running the pipeline."""
+    monkeypatch.setattr(reconstruction_route, "_cache", OrderedDict())
+    cached = {
+        "points": np.zeros((1, 3), dtype=np.float32),
+        "colors": np.ones((1, 3), dtype=np.float32),
+        "metrics": {"reprojection_rmse": 0.5},
+    }
+    reconstruction_route._cache_put(
+        reconstruction_route._cache_key(b"left", b"right", None, b"SIFT"), cached
+    )
+
+    files = {
+        "im0": ("im0.png", b"left", "image/png"),
+        "im1": ("im1.png", b"right", "image/png"),
+    }
+    resp = client.post("/api/reconstruct", files=files)
+    assert resp.status_code == 200
+    assert resp.json()["points"] == [[0.0, 0.0, 0.0]]
+
+
+class _FakePool:
+    def __init__(self):
+        self.shutdown_calls = []
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shutdown_calls.append((wait, cancel_futures))
+
+
+def test_discard_broken_pool_spares_replacement(monkeypatch):
+    """A late BrokenProcessPool must not shut down a pool another request already replaced."""
+    broken, replacement = _FakePool(), _FakePool()
+    monkeypatch.setattr(reconstruction_route, "_pool", replacement)
+
+    reconstruction_route._discard_broken_pool(broken)
+    assert reconstruction_route._pool is replacement
+    assert replacement.shutdown_calls == []
+
+    reconstruction_route._discard_broken_pool(replacement)
+    assert reconstruction_route._pool is None
+    assert replacement.shutdown_calls == [(False, True)]
+
+
+@pytest.mark.parametrize("value", ["3", "half"])
+def test_invalid_decode_reduction_rejected(monkeypatch, value):
+    monkeypatch.setenv("RECON_DECODE_REDUCTION", value)
+    with pytest.raises(ValueError, match="RECON_DECODE_REDUCTION"):
+        reconstruction_route._read_decode_reduction()
+
+
+def test_decode_reduction_defaults_to_full_resolution(monkeypatch):
+    monkeypatch.delenv("RECON_DECODE_REDUCTION", raising=False)
+    assert reconstruction_route._read_decode_reduction() == 1